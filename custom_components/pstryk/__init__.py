@@ -3,12 +3,14 @@ import logging
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.core import HomeAssistant
 from .const import DOMAIN
+from .services import async_setup_services
 
 _LOGGER = logging.getLogger(__name__)
 
 async def async_setup(hass: HomeAssistant, config: dict) -> bool:
-    """Only set up hass.data structure (no YAML config)."""
+    """Set up hass.data structure and services (no YAML config)."""
     hass.data.setdefault(DOMAIN, {})
+    async_setup_services(hass)
     return True
 
 async def async_setup_entry(
@@ -53,6 +55,11 @@ async def _cleanup_coordinators(hass: HomeAssistant, entry: ConfigEntry) -> None
                 coordinator._unsub_midnight = None
             # Remove from hass data
             hass.data[DOMAIN].pop(key, None)
+    # Energy coordinator has no scheduled callbacks of its own
+    hass.data[DOMAIN].pop(f"{entry.entry_id}_energy", None)
+    planner = hass.data[DOMAIN].pop(f"{entry.entry_id}_planner", None)
+    if planner:
+        planner.async_stop()
 
 async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Unload sensor platform and clear data."""
@@ -71,6 +78,10 @@ async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
         for key in list(hass.data[DOMAIN].keys()):
             if key.startswith(f"{entry.entry_id}_"):
                 hass.data[DOMAIN].pop(key, None)
+
+        # Drop shared API responses once no entry is loaded anymore
+        if not any(key.endswith(("_buy", "_sell", "_energy")) for key in hass.data[DOMAIN]):
+            hass.data[DOMAIN].pop("request_cache", None)
                 
     return unload_ok
 
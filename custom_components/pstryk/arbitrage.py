@@ -0,0 +1,156 @@
+"""Charge/discharge optimization for the Pstryk battery planner.
+
+Pure functions without Home Assistant dependencies.
+"""
+import math
+from .const import PLANNER_SOC_STEPS, PLANNER_MAX_SOC_STEPS
+
+ACTION_CHARGE = "charge"
+ACTION_DISCHARGE = "discharge"
+ACTION_IDLE = "idle"
+
+
+def leg_efficiency(efficiency):
+    """Return one-way efficiency for a round-trip efficiency in percent."""
+    return math.sqrt(max(min(efficiency, 100), 1) / 100)
+
+
+def build_slots(buy_prices, sell_prices, current_hour):
+    """Join hourly buy and sell prices on start, from the current hour on.
+
+    Hours missing from one of the lists get None for that price; the solver
+    then neither charges (no buy price) nor discharges (no sell price) in them.
+
+    Args:
+        buy_prices: List of {"start", "price"} dicts
+        sell_prices: List of {"start", "price"} dicts
+        current_hour: Local start of the current hour, same format as "start"
+
+    Returns:
+        List of (start, buy_price, sell_price) tuples
+    """
+    buy_by_start = {p["start"]: p["price"] for p in buy_prices}
+    sell_by_start = {p["start"]: p["price"] for p in sell_prices}
+    starts = sorted(s for s in set(buy_by_start) | set(sell_by_start) if s >= current_hour)
+    return [(s, buy_by_start.get(s), sell_by_start.get(s)) for s in starts]
+
+
+def soc_grid(capacity, charge_power, discharge_power, efficiency):
+    """Return number of SoC levels and energy per level for the solver.
+
+    The level size divides the stored energy the slower direction can move
+    in one hour, so that limit is honoured exactly and every hour allows at
+    least one step in both directions.
+
+    Raises:
+        ValueError: If the battery cannot be represented within
+            PLANNER_MAX_SOC_STEPS levels or the limits are not positive
+    """
+    if capacity <= 0 or charge_power <= 0 or discharge_power <= 0:
+        raise ValueError("Battery capacity and power limits must be positive")
+
+    leg = leg_efficiency(efficiency)
+    # Stored energy per hour, with power limits on the grid side of the losses
+    hourly_energy = min(charge_power * leg, discharge_power / leg)
+    per_hour = max(1, math.ceil(PLANNER_SOC_STEPS * hourly_energy / capacity))
+    unit = hourly_energy / per_hour
+    steps = int(capacity / unit + 1e-9)
+    if steps > PLANNER_MAX_SOC_STEPS:
+        raise ValueError(
+            f"Battery of {capacity} kWh needs {steps} state of charge levels at "
+            f"this power, more than the supported {PLANNER_MAX_SOC_STEPS}"
+        )
+    return steps, unit
+
+
+def solve_arbitrage(slots, capacity, charge_power, discharge_power, efficiency):
+    """Compute value and policy tables over discretized state of charge.
+
+    Backward dynamic program over hourly slots. Round-trip efficiency is split
+    evenly between charging and discharging. Energy left at the end of the
+    horizon is valued at zero.
+
+    Args:
+        slots: List of (start, buy_price, sell_price) tuples
+        capacity: Usable capacity in kWh
+        charge_power: Maximum charging power in kW
+        discharge_power: Maximum discharging power in kW
+        efficiency: Round-trip efficiency in percent
+
+    Returns:
+        (value, policy, unit) where value[t][s] is the best profit from slot t
+        at level s, policy[t][s] the level to reach by the end of slot t and
+        unit the energy per level in kWh
+
+    Raises:
+        ValueError: See soc_grid
+    """
+    steps, unit = soc_grid(capacity, charge_power, discharge_power, efficiency)
+    leg = leg_efficiency(efficiency)
+    # Power limits apply on the grid side of the conversion losses
+    max_up = int(charge_power * leg / unit + 1e-9)
+    max_down = int(discharge_power / leg / unit + 1e-9)
+
+    value = [[0.0] * (steps + 1) for _ in range(len(slots) + 1)]
+    policy = [list(range(steps + 1)) for _ in range(len(slots))]
+
+    for t in range(len(slots) - 1, -1, -1):
+        _, buy, sell = slots[t]
+        future = value[t + 1]
+        row = value[t]
+        choice = policy[t]
+        up = max_up if buy is not None else 0
+        down = max_down if sell is not None else 0
+        for level in range(steps + 1):
+            best = future[level]
+            for target in range(max(0, level - down), min(steps, level + up) + 1):
+                delta = (target - level) * unit
+                if delta > 0:
+                    gain = -buy * delta / leg
+                elif delta < 0:
+                    gain = -sell * delta * leg
+                else:
+                    continue
+                candidate = gain + future[target]
+                # Prefer idling when the gain is negligible
+                if candidate > best + 1e-9:
+                    best = candidate
+                    choice[level] = target
+            row[level] = best
+
+    return value, policy, unit
+
+
+def soc_level(soc_kwh, unit, steps):
+    """Return the solver level closest to the given state of charge."""
+    return min(max(round(soc_kwh / unit), 0), steps)
+
+
+def follow_policy(slots, policy, unit, capacity, efficiency, level):
+    """Walk the policy from the starting level into an hourly schedule."""
+    leg = leg_efficiency(efficiency)
+
+    schedule = []
+    for t, (start, buy, sell) in enumerate(slots):
+        target = policy[t][level]
+        stored = (target - level) * unit
+        if stored > 0:
+            action = ACTION_CHARGE
+            grid_kwh = stored / leg
+        elif stored < 0:
+            action = ACTION_DISCHARGE
+            grid_kwh = stored * leg
+        else:
+            action = ACTION_IDLE
+            grid_kwh = 0.0
+        level = target
+        schedule.append({
+            "start": start,
+            "action": action,
+            "grid_kwh": round(grid_kwh, 3),
+            "soc_kwh": round(level * unit, 3),
+            "soc_percent": round(level * unit / capacity * 100, 1),
+            "buy_price": buy,
+            "sell_price": sell,
+        })
+    return schedule
@@ -1,12 +1,30 @@
 """Config flow for Pstryk Energy integration."""
 from homeassistant import config_entries
+from homeassistant.helpers import selector
 import voluptuous as vol
 import aiohttp
 import asyncio
 import async_timeout
 from datetime import timedelta
 from homeassistant.util import dt as dt_util
-from .const import DOMAIN, API_URL, API_TIMEOUT
+from .arbitrage import soc_grid
+from .const import (
+    DOMAIN,
+    API_URL,
+    API_TIMEOUT,
+    CONF_ENERGY_RESOLUTION,
+    DEFAULT_ENERGY_RESOLUTION,
+    ENERGY_RESOLUTIONS,
+    CONF_BATTERY_CAPACITY,
+    CONF_BATTERY_CHARGE_POWER,
+    CONF_BATTERY_DISCHARGE_POWER,
+    CONF_BATTERY_EFFICIENCY,
+    CONF_BATTERY_SOC_ENTITY,
+    DEFAULT_BATTERY_CAPACITY,
+    DEFAULT_BATTERY_CHARGE_POWER,
+    DEFAULT_BATTERY_DISCHARGE_POWER,
+    DEFAULT_BATTERY_EFFICIENCY,
+)
 
 class PstrykConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
     """Handle a config flow for Pstryk Energy."""
@@ -74,19 +92,56 @@ class PstrykOptionsFlowHandler(config_entries.OptionsFlow):
 
     async def async_step_init(self, user_input=None):
         """Manage the options."""
+        errors = {}
         if user_input is not None:
-            return self.async_create_entry(title="", data=user_input)
+            # Sprawdź, czy planer obsłuży podaną baterię
+            if user_input[CONF_BATTERY_CAPACITY] > 0:
+                try:
+                    soc_grid(
+                        user_input[CONF_BATTERY_CAPACITY],
+                        user_input[CONF_BATTERY_CHARGE_POWER],
+                        user_input[CONF_BATTERY_DISCHARGE_POWER],
+                        user_input[CONF_BATTERY_EFFICIENCY],
+                    )
+                except ValueError:
+                    errors["base"] = "invalid_battery"
+
+            if not errors:
+                return self.async_create_entry(title="", data=user_input)
+
+        # Re-shown forms keep what the user entered
+        current = user_input or self.config_entry.options
 
         options = {
-            vol.Required("buy_top", default=self.config_entry.options.get(
+            vol.Required("buy_top", default=current.get(
                 "buy_top", self.config_entry.data.get("buy_top", 5))): vol.All(
                     vol.Coerce(int), vol.Range(min=1, max=24)),
-            vol.Required("sell_top", default=self.config_entry.options.get(
+            vol.Required("sell_top", default=current.get(
                 "sell_top", self.config_entry.data.get("sell_top", 5))): vol.All(
                     vol.Coerce(int), vol.Range(min=1, max=24)),
+            vol.Required(CONF_ENERGY_RESOLUTION, default=current.get(
+                CONF_ENERGY_RESOLUTION, DEFAULT_ENERGY_RESOLUTION)): vol.In(ENERGY_RESOLUTIONS),
+            # Battery / EV arbitrage planner (capacity 0 disables it)
+            vol.Required(CONF_BATTERY_CAPACITY, default=current.get(
+                CONF_BATTERY_CAPACITY, DEFAULT_BATTERY_CAPACITY)): vol.All(
+                    vol.Coerce(float), vol.Range(min=0, max=1000)),
+            vol.Required(CONF_BATTERY_CHARGE_POWER, default=current.get(
+                CONF_BATTERY_CHARGE_POWER, DEFAULT_BATTERY_CHARGE_POWER)): vol.All(
+                    vol.Coerce(float), vol.Range(min=0.1, max=1000)),
+            vol.Required(CONF_BATTERY_DISCHARGE_POWER, default=current.get(
+                CONF_BATTERY_DISCHARGE_POWER, DEFAULT_BATTERY_DISCHARGE_POWER)): vol.All(
+                    vol.Coerce(float), vol.Range(min=0.1, max=1000)),
+            vol.Required(CONF_BATTERY_EFFICIENCY, default=current.get(
+                CONF_BATTERY_EFFICIENCY, DEFAULT_BATTERY_EFFICIENCY)): vol.All(
+                    vol.Coerce(int), vol.Range(min=1, max=100)),
+            # Suggested rather than default, so the field can be cleared
+            vol.Optional(CONF_BATTERY_SOC_ENTITY, description={
+                "suggested_value": current.get(CONF_BATTERY_SOC_ENTITY)}): selector.EntitySelector(
+                    selector.EntitySelectorConfig(domain="sensor")),
         }
 
         return self.async_show_form(
             step_id="init", 
-            data_schema=vol.Schema(options)
+            data_schema=vol.Schema(options),
+            errors=errors
         )
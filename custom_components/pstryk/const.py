@@ -1,10 +1,56 @@
+from datetime import timedelta
+
 DOMAIN = "pstryk"
 API_URL = "https://api.pstryk.pl/integrations/"
 API_TIMEOUT = 30
+# Seconds a successful API response is reused by concurrent/overlapping refreshes
+API_CACHE_TTL = 30
 
 BUY_ENDPOINT = "pricing/?resolution=hour&window_start={start}&window_end={end}"
 SELL_ENDPOINT = "prosumer-pricing/?resolution=hour&window_start={start}&window_end={end}"
-ENERGY_USAGE_ENDPOINT = "meter-data/energy-usage/?for_tz=Europe%2FWarsaw&resolution=month&window_start={start}&window_end={end}"
+ENERGY_USAGE_ENDPOINT = "meter-data/energy-usage/?for_tz=Europe%2FWarsaw&resolution={resolution}&window_start={start}&window_end={end}"
+
+# Energy usage pipeline
+CONF_ENERGY_RESOLUTION = "energy_resolution"
+ENERGY_RESOLUTIONS = ("hour", "day", "month")
+DEFAULT_ENERGY_RESOLUTION = "day"
+# Frames are aligned to this zone, the for_tz requested from the API
+ENERGY_TIME_ZONE = "Europe/Warsaw"
+# How far back the cached usage series reaches
+ENERGY_RETENTION = {
+    "hour": timedelta(days=2),
+    "day": timedelta(days=30),
+    "month": timedelta(days=365),
+}
+# Already complete frames that are fetched again, as meter data often arrives late
+ENERGY_LOOKBACK = {
+    "hour": timedelta(days=1),
+    "day": timedelta(days=3),
+    "month": timedelta(days=3),
+}
+# (fastest, slowest) polling interval - backs off while meter data is unchanged
+ENERGY_POLL_INTERVALS = {
+    "hour": (timedelta(minutes=15), timedelta(hours=2)),
+    "day": (timedelta(hours=1), timedelta(hours=6)),
+    "month": (timedelta(hours=3), timedelta(hours=24)),
+}
+
+# Battery / EV arbitrage planner
+CONF_BATTERY_CAPACITY = "battery_capacity"
+CONF_BATTERY_CHARGE_POWER = "battery_charge_power"
+CONF_BATTERY_DISCHARGE_POWER = "battery_discharge_power"
+CONF_BATTERY_EFFICIENCY = "battery_efficiency"
+CONF_BATTERY_SOC_ENTITY = "battery_soc_entity"
+DEFAULT_BATTERY_CAPACITY = 0.0  # 0 disables the planner
+DEFAULT_BATTERY_CHARGE_POWER = 3.0
+DEFAULT_BATTERY_DISCHARGE_POWER = 3.0
+DEFAULT_BATTERY_EFFICIENCY = 90
+# State of charge levels used by the solver (raised when power limits need finer steps)
+PLANNER_SOC_STEPS = 20
+PLANNER_MAX_SOC_STEPS = 200
+
+SERVICE_PLAN_ARBITRAGE = "plan_arbitrage"
+SERVICE_PROFILE = "profile"
 
 ATTR_BUY_PRICE = "buy_price"
 ATTR_SELL_PRICE = "sell_price"
@@ -45,4 +45,16 @@ async def async_get_config_entry_diagnostics(
                 
             diagnostics_data["coordinators"][price_type] = coordinator_data
 
+    energy_coordinator = hass.data[DOMAIN].get(f"{entry.entry_id}_energy")
+    if energy_coordinator:
+        energy_data = energy_coordinator.data or {}
+        diagnostics_data["coordinators"]["energy"] = {
+            "last_update_success": energy_coordinator.last_update_success,
+            "data_available": energy_coordinator.data is not None,
+            "resolution": energy_coordinator.resolution,
+            "update_interval": str(energy_coordinator.update_interval),
+            "watermark": energy_data.get("watermark"),
+            "frame_count": len(energy_data.get("usage_frames", [])),
+        }
+
     return diagnostics_data
@@ -0,0 +1,89 @@
+"""Window arithmetic and frame merging for the Pstryk energy usage pipeline.
+
+Pure functions without Home Assistant dependencies.
+"""
+from datetime import datetime, timezone
+from .const import ENERGY_LOOKBACK, ENERGY_RETENTION
+
+
+def frame_floor(moment, resolution, tz):
+    """Return start of the frame containing the given moment, in UTC.
+
+    Args:
+        moment: Aware datetime
+        resolution: "hour", "day" or "month"
+        tz: Time zone the frames are aligned to
+    """
+    moment = moment.astimezone(tz).replace(minute=0, second=0, microsecond=0)
+    if resolution in ("day", "month"):
+        moment = moment.replace(hour=0)
+    if resolution == "month":
+        moment = moment.replace(day=1)
+    return moment.astimezone(timezone.utc)
+
+
+def fetch_window(now_utc, watermark, resolution, tz):
+    """Return where the next request starts and where the cache is cut off.
+
+    The first request covers the whole retention window. Later ones start
+    at the last complete frame or ENERGY_LOOKBACK back, whichever is earlier,
+    so late meter data for recent frames is picked up, but never before the
+    retention cutoff.
+
+    Returns:
+        (window_start, retention_start) in UTC
+    """
+    retention_start = frame_floor(now_utc - ENERGY_RETENTION[resolution], resolution, tz)
+    if watermark is None:
+        return retention_start, retention_start
+    lookback_start = frame_floor(now_utc - ENERGY_LOOKBACK[resolution], resolution, tz)
+    return max(min(watermark, lookback_start), retention_start), retention_start
+
+
+def _parse(value, tz):
+    """Parse a frame timestamp to UTC, reading naive ones in the frame zone."""
+    try:
+        moment = datetime.fromisoformat(value)
+    except (TypeError, ValueError):
+        return None
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=tz)
+    return moment.astimezone(timezone.utc)
+
+
+def merge_frames(cache, frames, now_utc, watermark, tz):
+    """Merge fetched frames into the cache keyed by UTC frame start.
+
+    Live frames are still being filled in by the meter and never move the
+    watermark; data arriving late for complete ones is picked up by the
+    ENERGY_LOOKBACK refetch and replaces the cached frame.
+
+    Returns:
+        (changed, watermark) - whether any frame was added or changed and the
+        start of the newest complete frame
+    """
+    changed = False
+    for frame in frames:
+        start = _parse(frame.get("start"), tz)
+        end = _parse(frame.get("end"), tz)
+        if start is None or end is None:
+            continue
+        if cache.get(start) != frame:
+            cache[start] = frame
+            changed = True
+        complete = end <= now_utc and not frame.get("is_live")
+        if complete and (watermark is None or start > watermark):
+            watermark = start
+    return changed, watermark
+
+
+def prune_frames(cache, retention_start):
+    """Drop frames that fell out of the retention window.
+
+    Returns:
+        True if any frame was dropped
+    """
+    expired = [start for start in cache if start < retention_start]
+    for start in expired:
+        cache.pop(start)
+    return bool(expired)
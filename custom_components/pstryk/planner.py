@@ -0,0 +1,183 @@
+"""Battery / EV arbitrage planner for Pstryk Energy integration."""
+import logging
+from homeassistant.core import callback
+from homeassistant.helpers.event import async_track_state_change_event, async_track_time_change
+from homeassistant.helpers.update_coordinator import DataUpdateCoordinator
+from homeassistant.util import dt as dt_util
+from .arbitrage import build_slots, follow_policy, soc_level, solve_arbitrage
+from .const import DOMAIN
+
+_LOGGER = logging.getLogger(__name__)
+
+
+def current_hour_start():
+    """Return local start of the current hour in the price list format."""
+    return dt_util.now().replace(minute=0, second=0, microsecond=0).strftime("%Y-%m-%dT%H:%M:%S")
+
+
+class PstrykArbitrageCoordinator(DataUpdateCoordinator):
+    """Keep a charge/discharge plan in sync with buy and sell prices.
+
+    The value tables only depend on future prices, so when the hour advances
+    or the state of charge changes the cached tables are reused and only the
+    policy is walked again. A full solve happens when price frames change.
+
+    The state of charge comes from a value given through the service for the
+    current hour, the configured SoC sensor, or the level the previous plan
+    reached by the start of the current hour, in that order.
+    """
+
+    def __init__(self, hass, buy_coordinator, sell_coordinator, capacity,
+                 charge_power, discharge_power, efficiency, soc_entity=None):
+        """Initialize the planner."""
+        self.buy_coordinator = buy_coordinator
+        self.sell_coordinator = sell_coordinator
+        self.capacity = capacity
+        self.charge_power = charge_power
+        self.discharge_power = discharge_power
+        self.efficiency = efficiency
+        self.soc_entity = soc_entity
+        # (hour start, kWh) given through the service, valid for that hour only
+        self._manual_soc = None
+        # (first slot start, kWh) the last plan started from
+        self._plan_start = None
+        self._missing_prices = 0
+        self._tables = None
+        self._unsub = []
+
+        super().__init__(hass, _LOGGER, name=f"{DOMAIN}_planner", always_update=False)
+
+    @callback
+    def async_start(self):
+        """Recompute the plan whenever one of its inputs changes."""
+        self._unsub.append(self.buy_coordinator.async_add_listener(self._handle_input_update))
+        self._unsub.append(self.sell_coordinator.async_add_listener(self._handle_input_update))
+        # Move the first slot along even when prices themselves do not change
+        self._unsub.append(
+            async_track_time_change(self.hass, self._handle_input_update, minute=0, second=5)
+        )
+        if self.soc_entity:
+            self._unsub.append(
+                async_track_state_change_event(self.hass, [self.soc_entity], self._handle_soc_update)
+            )
+
+    @callback
+    def async_stop(self):
+        """Stop listening to inputs."""
+        while self._unsub:
+            self._unsub.pop()()
+
+    @callback
+    def _handle_input_update(self, *_):
+        """Handle updated prices, time or state of charge."""
+        plan = self.compute_plan()
+        # async_set_updated_data always notifies, so only push real changes
+        if plan != self.data:
+            self.async_set_updated_data(plan)
+
+    @callback
+    def _handle_soc_update(self, _event):
+        """Handle a new state of charge reading, replacing any manual value."""
+        self._manual_soc = None
+        self._handle_input_update()
+
+    async def _async_update_data(self):
+        """Compute the plan on demand."""
+        return self.compute_plan()
+
+    def set_manual_soc(self, soc_kwh):
+        """Use the given state of charge for the rest of the current hour."""
+        self._manual_soc = (current_hour_start(), soc_kwh)
+
+    def _carried_soc_kwh(self, hour):
+        """Return the level the previous plan reached by the start of the hour."""
+        if self._plan_start is None or not self.data or not self.data.get("schedule"):
+            return None
+        if self._plan_start[0] == hour:
+            return self._plan_start[1]
+        soc_kwh = None
+        for slot in self.data["schedule"]:
+            if slot["start"] >= hour:
+                break
+            soc_kwh = slot["soc_kwh"]
+        return soc_kwh
+
+    def current_soc_kwh(self, hour):
+        """Return the state of charge at the start of the given hour in kWh."""
+        if self._manual_soc is not None:
+            if self._manual_soc[0] == hour:
+                return self._manual_soc[1]
+            self._manual_soc = None
+        if self.soc_entity:
+            state = self.hass.states.get(self.soc_entity)
+            if state is not None:
+                try:
+                    return min(max(float(state.state), 0), 100) / 100 * self.capacity
+                except (ValueError, TypeError):
+                    _LOGGER.debug("State of charge of %s unavailable: %s", self.soc_entity, state.state)
+        carried = self._carried_soc_kwh(hour)
+        return carried if carried is not None else 0.0
+
+    def _tables_for(self, slots):
+        """Return value/policy tables for the slots, reusing cached ones when possible."""
+        if self._tables is not None and slots:
+            cached_slots, value, policy, unit = self._tables
+            # Later hours of an unchanged horizon keep their optimal values
+            for offset in range(len(cached_slots)):
+                if cached_slots[offset:] == slots:
+                    return value[offset:], policy[offset:], unit
+                if cached_slots[offset][0] >= slots[0][0]:
+                    break
+
+        _LOGGER.debug("Solving arbitrage plan over %d slots", len(slots))
+        value, policy, unit = solve_arbitrage(
+            slots, self.capacity, self.charge_power, self.discharge_power, self.efficiency
+        )
+        self._tables = (slots, value, policy, unit)
+        return value, policy, unit
+
+    def compute_plan(self):
+        """Return the current plan."""
+        buy_data = self.buy_coordinator.data or {}
+        sell_data = self.sell_coordinator.data or {}
+        hour = current_hour_start()
+        slots = build_slots(buy_data.get("prices", []), sell_data.get("prices", []), hour)
+        soc_kwh = self.current_soc_kwh(hour)
+
+        missing = sum(1 for _, buy, sell in slots if buy is None or sell is None)
+        if missing != self._missing_prices:
+            self._missing_prices = missing
+            if missing:
+                _LOGGER.warning(
+                    "%d planned hours lack a buy or sell price and are planned without it", missing
+                )
+
+        try:
+            tables = self._tables_for(slots) if slots else None
+        except ValueError as err:
+            _LOGGER.error("Cannot plan battery arbitrage: %s", err)
+            tables = None
+
+        if tables is None:
+            return {
+                "action": None,
+                "schedule": [],
+                "expected_profit": None,
+                "soc_kwh": None,
+                "data_available": False,
+            }
+
+        value, policy, unit = tables
+        level = soc_level(soc_kwh, unit, len(value[0]) - 1)
+        schedule = follow_policy(slots, policy, unit, self.capacity, self.efficiency, level)
+        self._plan_start = (slots[0][0], soc_kwh)
+
+        return {
+            "action": schedule[0]["action"],
+            "schedule": schedule,
+            "expected_profit": round(value[0][level], 2),
+            # The level the plan starts from, not the raw reading, so a new
+            # reading only pushes an update when it changes the plan
+            "soc_kwh": round(level * unit, 3),
+            "data_available": True,
+        }
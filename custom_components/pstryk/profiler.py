@@ -0,0 +1,251 @@
+"""On-demand profiling of Pstryk coordinator and entity hot paths."""
+import asyncio
+import cProfile
+import io
+import logging
+import pstats
+import time
+from homeassistant.core import callback
+from homeassistant.helpers.event import async_call_later
+from homeassistant.util import dt as dt_util
+from .const import DOMAIN
+from .planner import PstrykArbitrageCoordinator
+from .update_coordinator import PstrykBaseCoordinator, PstrykEnergyUsageCoordinator
+from .sensor import (
+    PstrykPriceSensor,
+    PstrykEnergyUsageSensor,
+    PstrykArbitrageActionSensor,
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+# Phases reported in the summary, in pipeline order
+PHASES = (
+    "refresh",
+    "retry",
+    "request",
+    "network",
+    "json_decode",
+    "frame_loop",
+    "planner",
+    "attributes",
+)
+
+
+class PstrykProfiler:
+    """Profile the next N coordinator refreshes of the Pstryk integration.
+
+    Timing hooks are installed as instance/class attributes only while a
+    session is running and removed afterwards, so the hot paths carry no
+    instrumentation when the profiler is idle. cProfile starts with the first
+    profiled refresh and observes the whole event loop from then on, so other
+    integrations show up in the dump as well.
+    """
+
+    def __init__(self, hass, coordinators, refreshes, timeout):
+        """Initialize the profiler.
+
+        Args:
+            hass: Home Assistant instance
+            coordinators: Coordinators to instrument
+            refreshes: Number of coordinator refreshes to profile (each of
+                the buy, sell and energy coordinators counts separately)
+            timeout: Seconds after which the session stops regardless
+        """
+        self.hass = hass
+        self.coordinators = coordinators
+        self.refreshes = refreshes
+        self.timeout = timeout
+        self.refreshes_done = 0
+        self._stats = {phase: [] for phase in PHASES}
+        self._restore = []
+        self._profile = None
+        self._profile_requested = False
+        self._started = None
+        self._unsub_timeout = None
+        self._stopping = False
+
+    @property
+    def active(self):
+        """Return True while a session is running."""
+        return self._started is not None
+
+    def _record(self, phase, elapsed):
+        """Store a single timing sample."""
+        self._stats[phase].append(elapsed)
+
+    def _timed(self, phase, func, on_done=None, on_start=None):
+        """Wrap a function so its wall-clock duration is recorded."""
+        if asyncio.iscoroutinefunction(func):
+            async def async_wrapper(*args, **kwargs):
+                if on_start:
+                    on_start()
+                start = time.perf_counter()
+                try:
+                    return await func(*args, **kwargs)
+                finally:
+                    self._record(phase, time.perf_counter() - start)
+                    if on_done:
+                        on_done()
+            return async_wrapper
+
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                self._record(phase, time.perf_counter() - start)
+        return wrapper
+
+    def _patch_instance(self, obj, name, phase, on_done=None, on_start=None):
+        """Shadow a bound method with a timed wrapper on the instance."""
+        if not hasattr(obj, name):
+            return
+        setattr(obj, name, self._timed(phase, getattr(obj, name), on_done, on_start))
+        self._restore.append(lambda: obj.__dict__.pop(name, None))
+
+    def _patch_property(self, cls, name, phase):
+        """Replace a class property with a timed one."""
+        original = cls.__dict__.get(name)
+        if not isinstance(original, property):
+            return
+        setattr(cls, name, property(self._timed(phase, original.fget)))
+        self._restore.append(lambda: setattr(cls, name, original))
+
+    def _bypass_cache(self, cache):
+        """Disable response reuse while profiling; in-flight coalescing stays."""
+        ttl = cache.ttl
+        cache.ttl = 0
+        self._restore.append(lambda: setattr(cache, "ttl", ttl))
+
+    @callback
+    def _refresh_started(self):
+        """Start cProfile when the first profiled refresh begins."""
+        if self._profile_requested or self._stopping:
+            return
+        self._profile_requested = True
+        profile = cProfile.Profile()
+        try:
+            profile.enable()
+        except ValueError as err:
+            # Another profiler is already running - keep the phase timers only
+            _LOGGER.warning("cProfile unavailable, collecting phase timings only: %s", err)
+            return
+        self._profile = profile
+
+    @callback
+    def _refresh_done(self):
+        """Count a finished coordinator refresh."""
+        self.refreshes_done += 1
+        if self.refreshes_done >= self.refreshes and not self._stopping:
+            self._stopping = True
+            self.hass.async_create_task(self.async_stop())
+
+    @callback
+    def async_start(self):
+        """Install hooks and start collecting."""
+        for coordinator in self.coordinators:
+            if isinstance(coordinator, PstrykArbitrageCoordinator):
+                self._patch_instance(coordinator, "compute_plan", "planner")
+                continue
+            self._patch_instance(
+                coordinator, "_async_update_data", "refresh", self._refresh_done, self._refresh_started
+            )
+            self._patch_instance(coordinator.retry_mechanism, "execute", "retry")
+            self._patch_instance(coordinator, "_make_api_request", "request")
+            self._patch_instance(coordinator, "_fetch_api", "network")
+            self._patch_instance(coordinator, "_decode_json", "json_decode")
+            if isinstance(coordinator, PstrykEnergyUsageCoordinator):
+                self._patch_instance(coordinator, "_merge_frames", "frame_loop")
+            else:
+                self._patch_instance(coordinator, "_parse_price_frames", "frame_loop")
+
+        # Cached responses would hide the network and JSON decoding phases
+        for cache in {id(c.request_cache): c.request_cache for c in self.coordinators
+                      if isinstance(c, PstrykBaseCoordinator)}.values():
+            self._bypass_cache(cache)
+
+        for cls in (PstrykPriceSensor, PstrykEnergyUsageSensor, PstrykArbitrageActionSensor):
+            self._patch_property(cls, "extra_state_attributes", "attributes")
+
+        self._started = time.perf_counter()
+        self._unsub_timeout = async_call_later(self.hass, self.timeout, self._handle_timeout)
+        _LOGGER.info("Profiling next %d Pstryk coordinator refreshes", self.refreshes)
+
+    async def _handle_timeout(self, _):
+        """Stop a session that did not see enough refreshes in time."""
+        self._unsub_timeout = None
+        if not self._stopping:
+            self._stopping = True
+            _LOGGER.info("Pstryk profiling timed out after %d refreshes", self.refreshes_done)
+            await self.async_stop()
+
+    async def async_stop(self):
+        """Remove hooks and write the summary and profile dump."""
+        try:
+            if self._profile is not None:
+                self._profile.disable()
+            if self._unsub_timeout:
+                self._unsub_timeout()
+                self._unsub_timeout = None
+            while self._restore:
+                self._restore.pop()()
+
+            duration = time.perf_counter() - self._started
+            stamp = dt_util.now().strftime("%Y%m%d_%H%M%S")
+            summary_path = self.hass.config.path(f"pstryk_profile_{stamp}.txt")
+            dump_path = self.hass.config.path(f"pstryk_profile_{stamp}.prof")
+
+            await self.hass.async_add_executor_job(
+                self._write_files, summary_path, dump_path, duration
+            )
+            _LOGGER.info("Pstryk profile written to %s", summary_path)
+        except OSError as err:
+            _LOGGER.error("Failed to write Pstryk profile: %s", err)
+        finally:
+            self._started = None
+
+    def summary(self, duration):
+        """Return a human readable summary of the collected timings."""
+        lines = [
+            f"Pstryk profile - {self.refreshes_done} coordinator refreshes in {duration:.1f} s",
+            "",
+            f"{'phase':<14}{'calls':>8}{'total ms':>12}{'avg ms':>10}{'max ms':>10}",
+        ]
+        totals = {}
+        for phase in PHASES:
+            samples = self._stats[phase]
+            totals[phase] = sum(samples)
+            if not samples:
+                continue
+            lines.append(
+                f"{phase:<14}{len(samples):>8}{totals[phase] * 1000:>12.1f}"
+                f"{totals[phase] / len(samples) * 1000:>10.2f}{max(samples) * 1000:>10.2f}"
+            )
+
+        # Time spent in ExponentialBackoffRetry outside the requests themselves
+        backoff = totals["retry"] - totals["request"]
+        if backoff > 0.001:
+            lines.append(f"{'retry_backoff':<14}{'':>8}{backoff * 1000:>12.1f}")
+
+        if self._profile is not None:
+            stream = io.StringIO()
+            stats = pstats.Stats(self._profile, stream=stream)
+            stats.sort_stats(pstats.SortKey.CUMULATIVE).print_stats("pstryk|aiohttp|json", 40)
+            lines.extend(["", stream.getvalue()])
+        return "\n".join(lines)
+
+    def _write_files(self, summary_path, dump_path, duration):
+        """Write summary and cProfile dump (runs in executor)."""
+        with open(summary_path, "w", encoding="utf-8") as file:
+            file.write(self.summary(duration))
+        if self._profile is not None:
+            self._profile.dump_stats(dump_path)
+
+
+def coordinators_to_profile(hass):
+    """Return all Pstryk coordinators currently stored in hass.data."""
+    return [
+        obj for obj in hass.data.get(DOMAIN, {}).values()
+        if isinstance(obj, (PstrykBaseCoordinator, PstrykArbitrageCoordinator))
+    ]
@@ -0,0 +1,70 @@
+"""Shared request cache for the Pstryk API.
+
+No Home Assistant imports; the instance is only used for creating tasks.
+"""
+import asyncio
+import logging
+import time
+from .const import API_CACHE_TTL
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class SingleFlightRequestCache:
+    """Coalesce identical in-flight requests and briefly cache their results.
+
+    Responses are shared between callers and must be treated as read-only.
+    """
+
+    def __init__(self, hass, ttl=API_CACHE_TTL):
+        """Initialize the cache.
+
+        Args:
+            hass: Home Assistant instance owning the request tasks
+            ttl: Time in seconds a successful response is reused
+        """
+        self.hass = hass
+        self.ttl = ttl
+        self._inflight = {}
+        self._cache = {}
+
+    async def fetch(self, key, func):
+        """Return a cached response or await the shared request for the key.
+
+        Args:
+            key: Hashable request identity, the URL being the last item
+            func: Coroutine function performing the request
+
+        Returns:
+            Response returned by func
+        """
+        now = time.monotonic()
+        cached = self._cache.get(key)
+        if cached is not None and now - cached[0] < self.ttl:
+            _LOGGER.debug("Using cached response for %s", key[-1])
+            return cached[1]
+
+        task = self._inflight.get(key)
+        if task is None:
+            # Tracked by Home Assistant, so shutdown does not leave it dangling
+            task = self.hass.async_create_background_task(
+                func(), name=f"pstryk request {key[-1]}"
+            )
+            self._inflight[key] = task
+            task.add_done_callback(lambda t: self._request_done(key, t))
+        else:
+            _LOGGER.debug("Joining in-flight request for %s", key[-1])
+
+        # A cancelled caller must not cancel the request others are waiting on
+        return await asyncio.shield(task)
+
+    def _request_done(self, key, task):
+        """Store a successful result and forget the in-flight request."""
+        self._inflight.pop(key, None)
+        if task.cancelled() or task.exception() is not None:
+            return
+        now = time.monotonic()
+        # Drop expired entries so the cache cannot grow unbounded
+        for stale in [k for k, (ts, _) in self._cache.items() if now - ts >= self.ttl]:
+            self._cache.pop(stale)
+        self._cache[key] = (now, task.result())
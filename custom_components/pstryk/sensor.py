@@ -7,8 +7,23 @@ from homeassistant.core import HomeAssistant
 from homeassistant.components.sensor import SensorEntity, SensorStateClass
 from homeassistant.helpers.update_coordinator import CoordinatorEntity
 from homeassistant.util import dt as dt_util
-from .update_coordinator import PstrykDataUpdateCoordinator
-from .const import DOMAIN
+from .update_coordinator import PstrykDataUpdateCoordinator, PstrykEnergyUsageCoordinator
+from .arbitrage import soc_grid
+from .planner import PstrykArbitrageCoordinator
+from .const import (
+    DOMAIN,
+    CONF_ENERGY_RESOLUTION,
+    DEFAULT_ENERGY_RESOLUTION,
+    CONF_BATTERY_CAPACITY,
+    CONF_BATTERY_CHARGE_POWER,
+    CONF_BATTERY_DISCHARGE_POWER,
+    CONF_BATTERY_EFFICIENCY,
+    CONF_BATTERY_SOC_ENTITY,
+    DEFAULT_BATTERY_CAPACITY,
+    DEFAULT_BATTERY_CHARGE_POWER,
+    DEFAULT_BATTERY_DISCHARGE_POWER,
+    DEFAULT_BATTERY_EFFICIENCY,
+)
 from homeassistant.helpers.translation import async_get_translations
 from homeassistant.const import UnitOfEnergy
 
@@ -19,10 +34,13 @@ async def async_setup_entry(
     entry: ConfigEntry,
     async_add_entities,
 ) -> None:
-    """Set up the two Pstryk sensors via the coordinator."""
+    """Set up the Pstryk price and energy usage sensors via the coordinators."""
     api_key = hass.data[DOMAIN][entry.entry_id]["api_key"]
     buy_top = entry.options.get("buy_top", entry.data.get("buy_top", 5))
     sell_top = entry.options.get("sell_top", entry.data.get("sell_top", 5))
+    energy_resolution = entry.options.get(
+        CONF_ENERGY_RESOLUTION, entry.data.get(CONF_ENERGY_RESOLUTION, DEFAULT_ENERGY_RESOLUTION)
+    )
 
     _LOGGER.debug("Setting up Pstryk sensors with buy_top=%d, sell_top=%d", buy_top, sell_top)
 
@@ -39,6 +57,10 @@ async def async_setup_entry(
                 coordinator._unsub_midnight()
             # Remove from hass data
             hass.data[DOMAIN].pop(key, None)
+    hass.data[DOMAIN].pop(f"{entry.entry_id}_energy", None)
+    planner = hass.data[DOMAIN].pop(f"{entry.entry_id}_planner", None)
+    if planner:
+        planner.async_stop()
 
     entities = []
     coordinators = []
@@ -48,6 +70,9 @@ async def async_setup_entry(
         key = f"{entry.entry_id}_{price_type}"
         coordinator = PstrykDataUpdateCoordinator(hass, api_key, price_type)
         coordinators.append((coordinator, price_type, key))
+    energy_key = f"{entry.entry_id}_energy"
+    energy_coordinator = PstrykEnergyUsageCoordinator(hass, api_key, energy_resolution)
+    coordinators.append((energy_coordinator, "energy", energy_key))
         
     # Initialize coordinators in parallel to save time
     initial_refresh_tasks = []
@@ -78,17 +103,52 @@ async def async_setup_entry(
             _LOGGER.error("Failed to initialize %s coordinator: %s", 
                          price_type, str(refresh_results[i]))
             # Still add coordinator and set up sensors even if initial load failed
+
+        hass.data[DOMAIN][key] = coordinator
+
+        # Energy usage polls on its own adaptive interval
+        if price_type == "energy":
+            entities.append(PstrykEnergyUsageSensor(coordinator))
+            continue
         
         # Schedule updates
         coordinator.schedule_hourly_update()
         coordinator.schedule_midnight_update()
-        hass.data[DOMAIN][key] = coordinator
 
         # Create only one sensor per price type that combines both current price and table data
         top = buy_top if price_type == "buy" else sell_top
         entities.append(PstrykPriceSensor(coordinator, price_type, top))
 
-    async_add_entities(entities, True)
+    # Battery / EV arbitrage planner - only when a battery is configured
+    capacity = entry.options.get(CONF_BATTERY_CAPACITY, DEFAULT_BATTERY_CAPACITY)
+    charge_power = entry.options.get(CONF_BATTERY_CHARGE_POWER, DEFAULT_BATTERY_CHARGE_POWER)
+    discharge_power = entry.options.get(CONF_BATTERY_DISCHARGE_POWER, DEFAULT_BATTERY_DISCHARGE_POWER)
+    efficiency = entry.options.get(CONF_BATTERY_EFFICIENCY, DEFAULT_BATTERY_EFFICIENCY)
+    if capacity > 0:
+        try:
+            soc_grid(capacity, charge_power, discharge_power, efficiency)
+        except ValueError as err:
+            _LOGGER.error("Battery planner disabled: %s", err)
+            capacity = 0
+    if capacity > 0:
+        planner = PstrykArbitrageCoordinator(
+            hass,
+            hass.data[DOMAIN][f"{entry.entry_id}_buy"],
+            hass.data[DOMAIN][f"{entry.entry_id}_sell"],
+            capacity,
+            charge_power,
+            discharge_power,
+            efficiency,
+            entry.options.get(CONF_BATTERY_SOC_ENTITY) or None,
+        )
+        await planner.async_refresh()
+        planner.async_start()
+        hass.data[DOMAIN][f"{entry.entry_id}_planner"] = planner
+        entities.append(PstrykArbitrageActionSensor(planner))
+        entities.append(PstrykArbitrageProfitSensor(planner))
+
+    # Coordinators were refreshed above - no need to update again before adding
+    async_add_entities(entities)
 
 
 class PstrykPriceSensor(CoordinatorEntity, SensorEntity):
@@ -142,6 +202,10 @@ class PstrykPriceSensor(CoordinatorEntity, SensorEntity):
         """Get price data for the next hour."""
         if not self.coordinator.data:
             return None
+
+        # Coordinator resolves the next hour from the full 48h frame list
+        if self.coordinator.data.get("next") is not None:
+            return self.coordinator.data["next"]
             
         now = dt_util.as_local(dt_util.utcnow())
         next_hour = (now + timedelta(hours=1)).replace(minute=0, second=0, microsecond=0)
@@ -226,7 +290,9 @@ class PstrykPriceSensor(CoordinatorEntity, SensorEntity):
     @property
     def extra_state_attributes(self) -> dict:
         """Include the price table attributes in the current price sensor."""
-        now = dt_util.as_local(dt_util.utcnow())
+        # Time of the last price change, so unchanged refreshes render identically
+        last_change = self.coordinator.last_data_change
+        last_updated = dt_util.as_local(last_change).isoformat() if last_change else None
         
         # Get translated attribute name
         next_hour_key = self._translations.get(
@@ -240,7 +306,7 @@ class PstrykPriceSensor(CoordinatorEntity, SensorEntity):
                 "all_prices": [],
                 "best_prices": [],
                 "top_count": self.top_count,
-                "last_updated": now.isoformat(),
+                "last_updated": last_updated,
                 "price_count": 0,
                 "data_available": False
             }
@@ -259,7 +325,7 @@ class PstrykPriceSensor(CoordinatorEntity, SensorEntity):
             "best_prices": sorted_prices[: self.top_count],
             "top_count": self.top_count,
             "price_count": len(today),
-            "last_updated": now.isoformat(),
+            "last_updated": last_updated,
             "data_available": True
         }
         
@@ -276,24 +342,89 @@ class PstrykEnergyUsageSensor(CoordinatorEntity, SensorEntity):
     _attr_device_class = "energy"
     _attr_native_unit_of_measurement = UnitOfEnergy.KILO_WATT_HOUR
 
-    def __init__(self, coordinator: PstrykDataUpdateCoordinator):
+    def __init__(self, coordinator: PstrykEnergyUsageCoordinator):
         """Initialize the sensor."""
         super().__init__(coordinator)
         self._attr_name = "Pstryk Energy Usage"
-        self._attr_unique_id = f"{coordinator.name}_energy_usage"
+        self._attr_unique_id = f"{coordinator.name}_usage"
+
+    @property
+    def last_reset(self):
+        """Return start of the month the total is accumulated over."""
+        if self.coordinator.data and self.coordinator.data.get("period_start"):
+            return dt_util.parse_datetime(self.coordinator.data["period_start"])
+        return None
 
     @property
     def native_value(self):
-        """Return the total energy usage."""
-        if self.coordinator.data and "energy_usage" in self.coordinator.data:
-            return self.coordinator.data["energy_usage"].get("total_usage_kwh")
+        """Return the month-to-date energy usage."""
+        if self.coordinator.data:
+            return self.coordinator.data.get("total_usage_kwh")
         return None
 
     @property
     def extra_state_attributes(self):
         """Return additional attributes."""
-        if self.coordinator.data and "energy_usage" in self.coordinator.data:
+        if self.coordinator.data:
             return {
-                "usage_frames": self.coordinator.data["energy_usage"].get("usage_frames", []),
+                "usage_frames": self.coordinator.data.get("usage_frames", []),
+                "resolution": self.coordinator.data.get("resolution"),
             }
         return None
+
+
+class PstrykArbitrageActionSensor(CoordinatorEntity, SensorEntity):
+    """Planned battery action for the current hour with the full schedule."""
+
+    _attr_icon = "mdi:battery-sync"
+    # The 48-slot schedule is too large to store in the recorder on every change
+    _unrecorded_attributes = frozenset({"schedule"})
+
+    def __init__(self, coordinator: PstrykArbitrageCoordinator):
+        """Initialize the sensor."""
+        super().__init__(coordinator)
+        self._attr_name = "Pstryk Battery Plan"
+        self._attr_unique_id = f"{DOMAIN}_battery_plan"
+
+    @property
+    def native_value(self):
+        """Return the action planned for the current hour."""
+        if self.coordinator.data:
+            return self.coordinator.data.get("action")
+        return None
+
+    @property
+    def extra_state_attributes(self):
+        """Return the schedule and upcoming actions."""
+        if not self.coordinator.data:
+            return None
+        schedule = self.coordinator.data.get("schedule", [])
+        next_charge = next((s["start"] for s in schedule if s["action"] == "charge"), None)
+        next_discharge = next((s["start"] for s in schedule if s["action"] == "discharge"), None)
+        return {
+            "schedule": schedule,
+            "soc_kwh": self.coordinator.data.get("soc_kwh"),
+            "next_charge": next_charge,
+            "next_discharge": next_discharge,
+            "data_available": self.coordinator.data.get("data_available", False),
+        }
+
+
+class PstrykArbitrageProfitSensor(CoordinatorEntity, SensorEntity):
+    """Expected profit of the current battery plan."""
+
+    _attr_device_class = "monetary"
+    _attr_native_unit_of_measurement = "PLN"
+
+    def __init__(self, coordinator: PstrykArbitrageCoordinator):
+        """Initialize the sensor."""
+        super().__init__(coordinator)
+        self._attr_name = "Pstryk Battery Plan Profit"
+        self._attr_unique_id = f"{DOMAIN}_battery_plan_profit"
+
+    @property
+    def native_value(self):
+        """Return the expected profit over the planning horizon."""
+        if self.coordinator.data:
+            return self.coordinator.data.get("expected_profit")
+        return None
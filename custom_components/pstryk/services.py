@@ -0,0 +1,85 @@
+"""Services for Pstryk Energy integration."""
+import logging
+import voluptuous as vol
+from homeassistant.core import HomeAssistant, ServiceCall, SupportsResponse, callback
+from homeassistant.exceptions import HomeAssistantError
+import homeassistant.helpers.config_validation as cv
+from .const import DOMAIN, SERVICE_PLAN_ARBITRAGE, SERVICE_PROFILE
+from .planner import PstrykArbitrageCoordinator
+from .profiler import PstrykProfiler, coordinators_to_profile
+
+_LOGGER = logging.getLogger(__name__)
+
+PLAN_ARBITRAGE_SCHEMA = vol.Schema({
+    vol.Optional("config_entry_id"): cv.string,
+    vol.Optional("state_of_charge"): vol.All(vol.Coerce(float), vol.Range(min=0, max=100)),
+})
+
+PROFILE_SCHEMA = vol.Schema({
+    vol.Optional("refreshes", default=3): vol.All(vol.Coerce(int), vol.Range(min=1, max=100)),
+    vol.Optional("timeout", default=4200): vol.All(vol.Coerce(int), vol.Range(min=10, max=86400)),
+    vol.Optional("refresh", default=True): cv.boolean,
+})
+
+
+def _entry_objects(hass: HomeAssistant, suffix: str, entry_id=None) -> dict:
+    """Return per-entry objects stored in hass.data under the given key suffix."""
+    return {
+        key[: -len(suffix)]: obj
+        for key, obj in hass.data.get(DOMAIN, {}).items()
+        if key.endswith(suffix) and (entry_id is None or key == f"{entry_id}{suffix}")
+    }
+
+
+@callback
+def async_setup_services(hass: HomeAssistant) -> None:
+    """Register Pstryk services."""
+
+    async def handle_plan_arbitrage(call: ServiceCall):
+        """Recompute the battery plan, optionally from a given state of charge."""
+        planners = _entry_objects(hass, "_planner", call.data.get("config_entry_id"))
+        if not planners:
+            raise HomeAssistantError("No battery planner configured - set battery capacity in Pstryk options")
+
+        soc = call.data.get("state_of_charge")
+        response = {}
+        for entry_id, planner in planners.items():
+            if soc is not None:
+                planner.set_manual_soc(soc / 100 * planner.capacity)
+            await planner.async_refresh()
+            response[entry_id] = planner.data
+        _LOGGER.debug("Battery plan recomputed for %d entries", len(response))
+        return response
+
+    async def handle_profile(call: ServiceCall):
+        """Profile the next coordinator refreshes and write results to the config directory."""
+        profiler = hass.data[DOMAIN].get("profiler")
+        if profiler is not None and profiler.active:
+            raise HomeAssistantError("Pstryk profiling is already running")
+
+        coordinators = coordinators_to_profile(hass)
+        if not coordinators:
+            raise HomeAssistantError("No Pstryk coordinators to profile")
+
+        profiler = PstrykProfiler(hass, coordinators, call.data["refreshes"], call.data["timeout"])
+        hass.data[DOMAIN]["profiler"] = profiler
+        profiler.async_start()
+
+        if call.data["refresh"]:
+            for coordinator in coordinators:
+                if not isinstance(coordinator, PstrykArbitrageCoordinator):
+                    await coordinator.async_request_refresh()
+
+    if not hass.services.has_service(DOMAIN, SERVICE_PROFILE):
+        hass.services.async_register(
+            DOMAIN, SERVICE_PROFILE, handle_profile, schema=PROFILE_SCHEMA
+        )
+
+    if not hass.services.has_service(DOMAIN, SERVICE_PLAN_ARBITRAGE):
+        hass.services.async_register(
+            DOMAIN,
+            SERVICE_PLAN_ARBITRAGE,
+            handle_plan_arbitrage,
+            schema=PLAN_ARBITRAGE_SCHEMA,
+            supports_response=SupportsResponse.OPTIONAL,
+        )
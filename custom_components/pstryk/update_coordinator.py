@@ -1,4 +1,5 @@
 """Data update coordinator for Pstryk Energy integration."""
+import json
 import logging
 from datetime import timedelta
 import asyncio
@@ -7,7 +8,19 @@ import async_timeout
 from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed
 from homeassistant.helpers.event import async_track_point_in_time
 from homeassistant.util import dt as dt_util
-from .const import API_URL, API_TIMEOUT, BUY_ENDPOINT, SELL_ENDPOINT, DOMAIN, ENERGY_USAGE_ENDPOINT
+from .const import (
+    API_URL,
+    API_TIMEOUT,
+    BUY_ENDPOINT,
+    SELL_ENDPOINT,
+    DOMAIN,
+    ENERGY_USAGE_ENDPOINT,
+    ENERGY_POLL_INTERVALS,
+    ENERGY_TIME_ZONE,
+    DEFAULT_ENERGY_RESOLUTION,
+)
+from .energy import fetch_window, frame_floor, merge_frames, prune_frames
+from .request_cache import SingleFlightRequestCache
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -63,38 +76,36 @@ def convert_price(value):
         _LOGGER.warning("Price conversion error: %s", e)
         return None
 
-class PstrykDataUpdateCoordinator(DataUpdateCoordinator):
-    """Coordinator to fetch both price and energy data."""
-    
-    def __del__(self):
-        """Properly clean up when object is deleted."""
-        if hasattr(self, '_unsub_hourly') and self._unsub_hourly:
-            self._unsub_hourly()
-        if hasattr(self, '_unsub_midnight') and self._unsub_midnight:
-            self._unsub_midnight()
-            
-    def __init__(self, hass, api_key, price_type):
+class PstrykBaseCoordinator(DataUpdateCoordinator):
+    """Common API access for Pstryk coordinators."""
+
+    def __init__(self, hass, api_key, name, update_interval):
         """Initialize the coordinator."""
         self.hass = hass
         self.api_key = api_key
-        self.price_type = price_type
-        self._unsub_hourly = None
-        self._unsub_midnight = None
         self.retry_mechanism = ExponentialBackoffRetry()
-        
-        # Set a default update interval as a fallback (1 hour)
-        # This ensures data is refreshed even if scheduled updates fail
-        update_interval = timedelta(hours=1)
+        # Shared by all coordinators so overlapping refreshes cost one request
+        self.request_cache = hass.data.setdefault(DOMAIN, {}).setdefault(
+            "request_cache", SingleFlightRequestCache(hass)
+        )
 
         super().__init__(
             hass,
             _LOGGER,
-            name=f"{DOMAIN}_{price_type}",
-            update_interval=update_interval,  # Add fallback interval
+            name=name,
+            update_interval=update_interval,
+            # Listeners are only notified when the data actually changed
+            always_update=False,
         )
 
     async def _make_api_request(self, url):
-        """Make API request with proper error handling."""
+        """Make API request, coalesced with identical concurrent requests."""
+        return await self.request_cache.fetch(
+            (self.api_key, url), lambda: self._fetch_api(url)
+        )
+
+    async def _fetch_api(self, url):
+        """Perform the HTTP request with proper error handling."""
         async with aiohttp.ClientSession() as session:
             async with async_timeout.timeout(API_TIMEOUT):
                 resp = await session.get(
@@ -104,27 +115,61 @@ class PstrykDataUpdateCoordinator(DataUpdateCoordinator):
                 
                 # Obsługa różnych kodów błędu
                 if resp.status == 401:
-                    _LOGGER.error("API authentication failed for %s - invalid API key", self.price_type)
+                    _LOGGER.error("API authentication failed for %s - invalid API key", self.name)
                     raise UpdateFailed("API authentication failed - invalid API key")
                 elif resp.status == 403:
-                    _LOGGER.error("API access forbidden for %s - permissions issue", self.price_type)
+                    _LOGGER.error("API access forbidden for %s - permissions issue", self.name)
                     raise UpdateFailed("API access forbidden - check permissions")
                 elif resp.status == 404:
-                    _LOGGER.error("API endpoint not found for %s - check URL", self.price_type)
+                    _LOGGER.error("API endpoint not found for %s - check URL", self.name)
                     raise UpdateFailed("API endpoint not found")
                 elif resp.status == 429:
-                    _LOGGER.error("API rate limit exceeded for %s", self.price_type)
+                    _LOGGER.error("API rate limit exceeded for %s", self.name)
                     raise UpdateFailed("API rate limit exceeded - try again later")
                 elif resp.status != 200:
                     error_text = await resp.text()
-                    _LOGGER.error("API error %s for %s: %s", resp.status, self.price_type, error_text)
+                    _LOGGER.error("API error %s for %s: %s", resp.status, self.name, error_text)
                     raise UpdateFailed(f"API error {resp.status}: {error_text[:100]}")
                 
-                return await resp.json()
+                return self._decode_json(await resp.text())
+
+    def _decode_json(self, body):
+        """Decode JSON response body."""
+        return json.loads(body)
+
+
+class PstrykDataUpdateCoordinator(PstrykBaseCoordinator):
+    """Coordinator to fetch price data."""
+    
+    def __del__(self):
+        """Properly clean up when object is deleted."""
+        if hasattr(self, '_unsub_hourly') and self._unsub_hourly:
+            self._unsub_hourly()
+        if hasattr(self, '_unsub_midnight') and self._unsub_midnight:
+            self._unsub_midnight()
+            
+    def __init__(self, hass, api_key, price_type):
+        """Initialize the coordinator."""
+        self.price_type = price_type
+        self._unsub_hourly = None
+        self._unsub_midnight = None
+        # Time the price data last changed
+        self.last_data_change = None
+        
+        # Set a default update interval as a fallback (1 hour)
+        # This ensures data is refreshed even if scheduled updates fail
+        update_interval = timedelta(hours=1)
+
+        super().__init__(
+            hass,
+            api_key,
+            name=f"{DOMAIN}_{price_type}",
+            update_interval=update_interval,  # Add fallback interval
+        )
 
     async def _async_update_data(self):
-        """Fetch price and energy usage data."""
-        _LOGGER.debug("Starting %s price and energy update", self.price_type)
+        """Fetch price data."""
+        _LOGGER.debug("Starting %s price update", self.price_type)
 
         # --- Price Data ---
         today_local = dt_util.now().replace(hour=0, minute=0, second=0, microsecond=0)
@@ -135,60 +180,57 @@ class PstrykDataUpdateCoordinator(DataUpdateCoordinator):
         price_endpoint_tpl = BUY_ENDPOINT if self.price_type == "buy" else SELL_ENDPOINT
         price_url = f"{API_URL}{price_endpoint_tpl.format(start=start_utc, end=end_utc)}"
 
-        # --- Energy Usage Data ---
-        start_energy_utc = (dt_util.now() - timedelta(days=30)).strftime("%Y-%m-%dT%H:%M:%SZ")
-        end_energy_utc = dt_util.now().strftime("%Y-%m-%dT%H:%M:%SZ")
-        energy_url = f"{API_URL}{ENERGY_USAGE_ENDPOINT.format(start=start_energy_utc, end=end_energy_utc)}"
-
         try:
-            # Fetch data concurrently
-            price_data, energy_data = await asyncio.gather(
-                self.retry_mechanism.execute(self._make_api_request, price_url),
-                self.retry_mechanism.execute(self._make_api_request, energy_url),
-            )
+            price_data = await self.retry_mechanism.execute(self._make_api_request, price_url)
 
-            # Process price data
-            frames = price_data.get("frames", [])
-            prices = []
-            current_price = None
-            now_utc = dt_util.utcnow()
-
-            for f in frames:
-                val = convert_price(f.get("price_gross"))
-                if val is None:
-                    continue
-                start = dt_util.parse_datetime(f["start"])
-                end = dt_util.parse_datetime(f["end"])
-                if not start or not end:
-                    continue
-                local_start = dt_util.as_local(start).strftime("%Y-%m-%dT%H:%M:%S")
-                prices.append({"start": local_start, "price": val})
-                if start <= now_utc < end:
-                    current_price = val
+            prices, current_price, next_price = self._parse_price_frames(price_data.get("frames", []))
 
             today_str = today_local.strftime("%Y-%m-%d")
             prices_today = [p for p in prices if p["start"].startswith(today_str)]
 
-            # Process energy usage data
-            total_usage = energy_data.get("total_usage_kwh", None)
-            usage_frames = energy_data.get("usage_frames", [])
-
-            _LOGGER.debug("Successfully fetched energy data: total_usage=%s", total_usage)
-
-            return {
+            data = {
                 "prices_today": prices_today,
                 "prices": prices,
                 "current": current_price,
-                "energy_usage": {
-                    "total_usage_kwh": total_usage,
-                    "usage_frames": usage_frames,
-                },
+                "next": next_price,
             }
+            if data != self.data:
+                self.last_data_change = dt_util.utcnow()
+            return data
 
         except Exception as err:
             _LOGGER.exception("Error fetching data: %s", err)
             raise UpdateFailed(f"Error fetching data: {err}")
 
+    def _parse_price_frames(self, frames):
+        """Convert API frames to local hourly prices.
+
+        Returns:
+            (prices, current_price, next_price) tuple
+        """
+        prices = []
+        current_price = None
+        next_price = None
+        now_utc = dt_util.utcnow()
+        next_hour_utc = now_utc + timedelta(hours=1)
+
+        for f in frames:
+            val = convert_price(f.get("price_gross"))
+            if val is None:
+                continue
+            start = dt_util.parse_datetime(f["start"])
+            end = dt_util.parse_datetime(f["end"])
+            if not start or not end:
+                continue
+            local_start = dt_util.as_local(start).strftime("%Y-%m-%dT%H:%M:%S")
+            prices.append({"start": local_start, "price": val})
+            if start <= now_utc < end:
+                current_price = val
+            if start <= next_hour_utc < end:
+                next_price = val
+
+        return prices, current_price, next_price
+
     def schedule_hourly_update(self):
         """Schedule next refresh 1 min after each full hour."""
         if self._unsub_hourly:
@@ -235,3 +277,106 @@ class PstrykDataUpdateCoordinator(DataUpdateCoordinator):
         _LOGGER.debug("Running scheduled midnight update for %s", self.price_type)
         await self.async_request_refresh()
         self.schedule_midnight_update()
+
+
+class PstrykEnergyUsageCoordinator(PstrykBaseCoordinator):
+    """Coordinator for meter data with its own adaptive polling cadence.
+
+    Only frames from the last complete one onward (plus a lookback margin for
+    late meter data) are requested on each poll and merged into a cached
+    series, so a poll downloads a few frames instead of the whole retention
+    window. The reported total is the API's month-to-date usage.
+    """
+
+    def __init__(self, hass, api_key, resolution=DEFAULT_ENERGY_RESOLUTION):
+        """Initialize the coordinator."""
+        self.resolution = resolution
+        self._min_interval, self._max_interval = ENERGY_POLL_INTERVALS[resolution]
+        # Frame start (UTC) -> raw frame from the API
+        self._frames = {}
+        # Start of the newest frame that is already complete
+        self._watermark = None
+        self._time_zone = dt_util.get_time_zone(ENERGY_TIME_ZONE)
+
+        super().__init__(
+            hass,
+            api_key,
+            name=f"{DOMAIN}_energy",
+            update_interval=self._min_interval,
+        )
+
+    def _merge_frames(self, frames, now_utc):
+        """Merge fetched frames into the cached series and move the watermark.
+
+        Returns:
+            True if any frame was added or changed
+        """
+        changed, self._watermark = merge_frames(
+            self._frames, frames, now_utc, self._watermark, self._time_zone
+        )
+        return changed
+
+    def _adapt_interval(self, changed):
+        """Poll fast while data moves, back off while it is unchanged."""
+        if changed:
+            interval = self._min_interval
+        else:
+            interval = min(self.update_interval * 2, self._max_interval)
+        if interval != self.update_interval:
+            _LOGGER.debug("Energy polling interval set to %s", interval)
+        self.update_interval = interval
+
+    def _url(self, resolution, start, end):
+        """Return energy usage URL for the given window."""
+        start_utc = start.strftime("%Y-%m-%dT%H:%M:%SZ")
+        end_utc = end.strftime("%Y-%m-%dT%H:%M:%SZ")
+        endpoint = ENERGY_USAGE_ENDPOINT.format(resolution=resolution, start=start_utc, end=end_utc)
+        return f"{API_URL}{endpoint}"
+
+    async def _async_update_data(self):
+        """Fetch new energy usage frames and the month-to-date total."""
+        now_utc = dt_util.utcnow()
+        window_start, retention_start = fetch_window(
+            now_utc, self._watermark, self.resolution, self._time_zone
+        )
+        period_start = frame_floor(now_utc, "month", self._time_zone)
+
+        _LOGGER.debug("Starting energy update from %s (%s)", window_start.isoformat(), self.resolution)
+
+        try:
+            energy_data, period_data = await asyncio.gather(
+                self.retry_mechanism.execute(
+                    self._make_api_request, self._url(self.resolution, window_start, now_utc)
+                ),
+                # A single month frame - the API totals the fixed period for us
+                self.retry_mechanism.execute(
+                    self._make_api_request, self._url("month", period_start, now_utc)
+                ),
+            )
+        except Exception as err:
+            _LOGGER.exception("Error fetching energy data: %s", err)
+            raise UpdateFailed(f"Error fetching energy data: {err}")
+
+        changed = self._merge_frames(energy_data.get("usage_frames", []), now_utc)
+
+        if prune_frames(self._frames, retention_start):
+            changed = True
+
+        total_usage = period_data.get("total_usage_kwh")
+        if self.data is None or total_usage != self.data.get("total_usage_kwh"):
+            changed = True
+
+        self._adapt_interval(changed)
+
+        _LOGGER.debug(
+            "Successfully fetched energy data: frames=%d, total_usage=%s",
+            len(self._frames), total_usage,
+        )
+
+        return {
+            "total_usage_kwh": total_usage,
+            "period_start": period_start.isoformat(),
+            "usage_frames": [self._frames[s] for s in sorted(self._frames)],
+            "resolution": self.resolution,
+            "watermark": self._watermark.isoformat() if self._watermark else None,
+        }
@@ -0,0 +1,11 @@
+"""Test setup for Pstryk modules that do not depend on Home Assistant."""
+import os
+import sys
+import types
+
+# Expose custom_components/pstryk as the "pstryk" package without running its
+# __init__.py, which imports Home Assistant.
+_PACKAGE_DIR = os.path.join(os.path.dirname(__file__), "..", "custom_components", "pstryk")
+_package = types.ModuleType("pstryk")
+_package.__path__ = [os.path.abspath(_PACKAGE_DIR)]
+sys.modules.setdefault("pstryk", _package)
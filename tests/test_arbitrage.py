@@ -0,0 +1,130 @@
+"""Tests for the battery arbitrage solver."""
+import pytest
+
+from pstryk.arbitrage import (
+    ACTION_CHARGE,
+    ACTION_DISCHARGE,
+    ACTION_IDLE,
+    build_slots,
+    follow_policy,
+    leg_efficiency,
+    soc_grid,
+    soc_level,
+    solve_arbitrage,
+)
+from pstryk.const import PLANNER_MAX_SOC_STEPS
+
+
+def _slots(buy, sell_ratio=0.8):
+    """Return hourly slots for the given buy prices."""
+    return [
+        (f"2026-10-19T{hour:02d}:00:00", price, round(price * sell_ratio, 4))
+        for hour, price in enumerate(buy)
+    ]
+
+
+CHEAP_THEN_EXPENSIVE = _slots([0.2] * 12 + [1.5] * 12)
+
+
+@pytest.mark.parametrize(
+    "capacity, charge_power, discharge_power, efficiency",
+    [
+        (10, 3, 3, 90),
+        (100, 3.7, 3.7, 90),
+        (60, 11, 11, 85),
+        (1, 11, 11, 100),
+        (13.5, 5, 7, 92),
+    ],
+)
+def test_soc_grid_allows_full_power_step(capacity, charge_power, discharge_power, efficiency):
+    """Every hour allows at least one step and the slower limit is used exactly."""
+    steps, unit = soc_grid(capacity, charge_power, discharge_power, efficiency)
+    leg = leg_efficiency(efficiency)
+    max_up = int(charge_power * leg / unit + 1e-9)
+    max_down = int(discharge_power / leg / unit + 1e-9)
+
+    assert 1 <= steps <= PLANNER_MAX_SOC_STEPS
+    assert steps * unit <= capacity + 1e-9
+    assert max_up >= 1 and max_down >= 1
+    hourly = min(charge_power * leg, discharge_power / leg)
+    assert min(max_up, max_down) * unit == pytest.approx(hourly)
+
+
+def test_soc_grid_refuses_too_many_levels():
+    """A huge battery with a tiny charger cannot be represented."""
+    with pytest.raises(ValueError):
+        soc_grid(1000, 1, 1, 90)
+
+
+@pytest.mark.parametrize("charge_power, discharge_power", [(0, 3), (3, 0)])
+def test_soc_grid_refuses_zero_power(charge_power, discharge_power):
+    """Power limits must be positive."""
+    with pytest.raises(ValueError):
+        soc_grid(10, charge_power, discharge_power, 90)
+
+
+def test_solve_arbitrage_charges_ev():
+    """A large EV battery with a slow charger still charges when cheap."""
+    value, policy, unit = solve_arbitrage(CHEAP_THEN_EXPENSIVE, 100, 3.7, 3.7, 90)
+    schedule = follow_policy(CHEAP_THEN_EXPENSIVE, policy, unit, 100, 90, 0)
+
+    charges = [slot for slot in schedule if slot["action"] == ACTION_CHARGE]
+    assert charges
+    assert all(slot["start"] < "2026-10-19T12" for slot in charges)
+    assert all(slot["grid_kwh"] <= 3.7 + 1e-3 for slot in charges)
+    assert value[0][0] > 0
+
+
+def test_solve_arbitrage_flat_prices_stay_idle():
+    """No spread means nothing to gain."""
+    slots = _slots([0.5] * 24, sell_ratio=1.0)
+    value, policy, unit = solve_arbitrage(slots, 10, 3, 3, 90)
+    schedule = follow_policy(slots, policy, unit, 10, 90, 0)
+
+    assert value[0][0] == 0
+    assert {slot["action"] for slot in schedule} == {ACTION_IDLE}
+
+
+def test_solve_arbitrage_skips_missing_prices():
+    """Hours without a buy price never charge, without a sell price never discharge."""
+    slots = CHEAP_THEN_EXPENSIVE[:]
+    slots[0] = (slots[0][0], None, slots[0][2])
+    slots[-1] = (slots[-1][0], slots[-1][1], None)
+    _, policy, unit = solve_arbitrage(slots, 10, 3, 3, 90)
+    schedule = follow_policy(slots, policy, unit, 10, 90, 0)
+
+    assert schedule[0]["action"] != ACTION_CHARGE
+    assert schedule[-1]["action"] != ACTION_DISCHARGE
+
+
+def test_follow_policy_respects_limits_from_full_battery():
+    """A full battery discharges in expensive hours within capacity and power."""
+    slots = _slots([2.0, 1.9, 1.8, 1.7, 1.6, 1.5] + [0.2] * 6 + [1.5] * 6)
+    capacity, power = 10, 3
+    steps, _ = soc_grid(capacity, power, power, 90)
+    _, policy, unit = solve_arbitrage(slots, capacity, power, power, 90)
+    schedule = follow_policy(slots, policy, unit, capacity, 90, steps)
+
+    assert schedule[0]["action"] == ACTION_DISCHARGE
+    assert all(0 <= slot["soc_kwh"] <= capacity for slot in schedule)
+    assert all(abs(slot["grid_kwh"]) <= power + 1e-3 for slot in schedule)
+    # Energy left at the end of the horizon is worth nothing
+    assert schedule[-1]["soc_kwh"] == 0
+
+
+def test_soc_level_clamps():
+    """State of charge maps to the nearest valid level."""
+    assert soc_level(-1, 0.5, 20) == 0
+    assert soc_level(2.6, 0.5, 20) == 5
+    assert soc_level(50, 0.5, 20) == 20
+
+
+def test_build_slots_joins_on_start():
+    """A missing sell frame does not cut off the rest of the horizon."""
+    buy = [{"start": f"2026-10-19T{h:02d}:00:00", "price": 0.5} for h in range(6)]
+    sell = [p for p in buy if p["start"] != "2026-10-19T02:00:00"]
+
+    slots = build_slots(buy, sell, "2026-10-19T01:00:00")
+
+    assert [s[0][11:13] for s in slots] == ["01", "02", "03", "04", "05"]
+    assert slots[1] == ("2026-10-19T02:00:00", 0.5, None)
@@ -0,0 +1,126 @@
+"""Tests for the energy usage window arithmetic and frame merging."""
+from datetime import datetime, timedelta, timezone
+from zoneinfo import ZoneInfo
+
+import pytest
+
+from pstryk.energy import fetch_window, frame_floor, merge_frames, prune_frames
+
+WARSAW = ZoneInfo("Europe/Warsaw")
+UTC = timezone.utc
+
+
+def _utc(*args):
+    return datetime(*args, tzinfo=UTC)
+
+
+def _frame(start, hours=24, usage=1.0, is_live=False):
+    """Return a frame as the API reports it, in Warsaw time."""
+    start = start.astimezone(WARSAW)
+    return {
+        "start": start.isoformat(),
+        "end": (start + timedelta(hours=hours)).isoformat(),
+        "fae_usage": usage,
+        "is_live": is_live,
+    }
+
+
+@pytest.mark.parametrize(
+    "moment, resolution, expected",
+    [
+        # 00:30 in Warsaw (CEST) belongs to the new day and month
+        (_utc(2026, 9, 30, 22, 30), "day", _utc(2026, 9, 30, 22)),
+        (_utc(2026, 9, 30, 22, 30), "month", _utc(2026, 9, 30, 22)),
+        (_utc(2026, 9, 30, 22, 30), "hour", _utc(2026, 9, 30, 22)),
+        # After the switch to CET the day starts an hour later in UTC
+        (_utc(2026, 11, 5, 12), "day", _utc(2026, 11, 4, 23)),
+        (_utc(2026, 11, 5, 12), "month", _utc(2026, 10, 31, 23)),
+    ],
+)
+def test_frame_floor_uses_frame_zone(moment, resolution, expected):
+    """Frames start at Warsaw midnight regardless of the server zone."""
+    assert frame_floor(moment, resolution, WARSAW) == expected
+
+
+def test_fetch_window_first_poll_covers_retention():
+    """Without a watermark the whole retention window is requested."""
+    now = _utc(2026, 10, 19, 10)
+    window_start, retention_start = fetch_window(now, None, "day", WARSAW)
+
+    assert window_start == retention_start == _utc(2026, 9, 18, 22)
+
+
+def test_fetch_window_refetches_lookback():
+    """A recent watermark still refetches the lookback margin for late data."""
+    now = _utc(2026, 10, 19, 10)
+    watermark = _utc(2026, 10, 18, 22)
+    window_start, _ = fetch_window(now, watermark, "day", WARSAW)
+
+    assert window_start == _utc(2026, 10, 15, 22)
+
+
+def test_fetch_window_starts_at_stale_watermark():
+    """After a gap the request starts at the last complete frame."""
+    now = _utc(2026, 10, 19, 10)
+    watermark = _utc(2026, 10, 9, 22)
+    window_start, _ = fetch_window(now, watermark, "day", WARSAW)
+
+    assert window_start == watermark
+
+
+def test_fetch_window_never_before_retention():
+    """A watermark older than the retention window is clamped to it."""
+    now = _utc(2026, 10, 19, 10)
+    window_start, retention_start = fetch_window(now, _utc(2026, 1, 1), "day", WARSAW)
+
+    assert window_start == retention_start
+
+
+def test_merge_frames_moves_watermark_past_complete_frames_only():
+    """The live frame is cached but does not count as complete."""
+    now = _utc(2026, 10, 19, 10)
+    frames = [
+        _frame(_utc(2026, 10, 17, 22)),
+        _frame(_utc(2026, 10, 18, 22), is_live=True),
+    ]
+    cache = {}
+
+    changed, watermark = merge_frames(cache, frames, now, None, WARSAW)
+
+    assert changed
+    assert watermark == _utc(2026, 10, 17, 22)
+    assert sorted(cache) == [_utc(2026, 10, 17, 22), _utc(2026, 10, 18, 22)]
+
+
+def test_merge_frames_picks_up_late_data():
+    """A refetched complete frame with new usage replaces the cached one."""
+    now = _utc(2026, 10, 19, 10)
+    start = _utc(2026, 10, 16, 22)
+    cache = {}
+    _, watermark = merge_frames(cache, [_frame(start, usage=1.0)], now, None, WARSAW)
+
+    changed, _ = merge_frames(cache, [_frame(start, usage=1.0)], now, watermark, WARSAW)
+    assert not changed
+
+    changed, new_watermark = merge_frames(cache, [_frame(start, usage=4.2)], now, watermark, WARSAW)
+    assert changed
+    assert new_watermark == watermark
+    assert cache[start]["fae_usage"] == 4.2
+
+
+def test_merge_frames_skips_unparsable_frames():
+    """Frames without valid timestamps are ignored."""
+    cache = {}
+    changed, watermark = merge_frames(cache, [{"start": None, "end": "x"}], _utc(2026, 10, 19), None, WARSAW)
+
+    assert (changed, watermark, cache) == (False, None, {})
+
+
+def test_prune_frames_drops_expired_frames():
+    """Frames before the retention cutoff are removed."""
+    cutoff = _utc(2026, 9, 18, 22)
+    cache = {cutoff - timedelta(days=1): {}, cutoff: {}, cutoff + timedelta(days=1): {}}
+
+    assert prune_frames(cache, cutoff)
+    assert sorted(cache) == [cutoff, cutoff + timedelta(days=1)]
+    assert not prune_frames(cache, cutoff)
@@ -0,0 +1,112 @@
+"""Tests for the shared single-flight request cache."""
+import asyncio
+
+import pytest
+
+from pstryk.request_cache import SingleFlightRequestCache
+
+KEY = ("api-key", "https://api.pstryk.pl/integrations/pricing/")
+
+
+class FakeHass:
+    """Minimal stand-in creating background tasks on the running loop."""
+
+    def __init__(self):
+        self.task_names = []
+
+    def async_create_background_task(self, target, name):
+        self.task_names.append(name)
+        return asyncio.get_running_loop().create_task(target, name=name)
+
+
+class FakeRequest:
+    """Request that can be held open and counts its calls."""
+
+    def __init__(self, result="response", error=None):
+        self.calls = 0
+        self.result = result
+        self.error = error
+        self.release = None
+
+    async def __call__(self):
+        self.calls += 1
+        if self.release is not None:
+            await self.release.wait()
+        if self.error is not None:
+            raise self.error
+        return self.result
+
+
+def test_concurrent_requests_are_coalesced():
+    """Callers asking for the same key share a single request."""
+    async def run():
+        hass = FakeHass()
+        cache = SingleFlightRequestCache(hass)
+        request = FakeRequest()
+        request.release = asyncio.Event()
+
+        callers = [asyncio.ensure_future(cache.fetch(KEY, request)) for _ in range(3)]
+        await asyncio.sleep(0)
+        request.release.set()
+        results = await asyncio.gather(*callers)
+
+        assert results == ["response"] * 3
+        assert request.calls == 1
+        assert hass.task_names == [f"pstryk request {KEY[-1]}"]
+
+    asyncio.run(run())
+
+
+def test_response_reused_until_ttl_expires():
+    """A finished response is served from cache only within the TTL."""
+    async def run():
+        cache = SingleFlightRequestCache(FakeHass(), ttl=0.05)
+        request = FakeRequest()
+
+        await cache.fetch(KEY, request)
+        await cache.fetch(KEY, request)
+        assert request.calls == 1
+
+        await asyncio.sleep(0.1)
+        await cache.fetch(KEY, request)
+        assert request.calls == 2
+
+    asyncio.run(run())
+
+
+def test_failures_are_not_cached():
+    """A failed request is retried by the next caller."""
+    async def run():
+        cache = SingleFlightRequestCache(FakeHass())
+        request = FakeRequest(error=ValueError("boom"))
+
+        with pytest.raises(ValueError):
+            await cache.fetch(KEY, request)
+
+        request.error = None
+        assert await cache.fetch(KEY, request) == "response"
+        assert request.calls == 2
+
+    asyncio.run(run())
+
+
+def test_cancelled_caller_does_not_cancel_shared_request():
+    """Other callers still get the result, and it is cached for later ones."""
+    async def run():
+        cache = SingleFlightRequestCache(FakeHass())
+        request = FakeRequest()
+        request.release = asyncio.Event()
+
+        first = asyncio.ensure_future(cache.fetch(KEY, request))
+        second = asyncio.ensure_future(cache.fetch(KEY, request))
+        await asyncio.sleep(0)
+        first.cancel()
+        await asyncio.sleep(0)
+        request.release.set()
+
+        assert await second == "response"
+        assert first.cancelled()
+        assert await cache.fetch(KEY, request) == "response"
+        assert request.calls == 1
+
+    asyncio.run(run())